@@ -22,6 +22,7 @@ const DELETE_COLOR = '#FFE0E0';
 const S3_RESULT_FILE_KEY = 'linkcheck_result.csv';
 const S3_FLAG_FILE_KEY = 'lambda_completion_status.json';
 const RESULT_SHEET_COLUMN_COUNT = 8;
+const MAX_DIFF_ITEMS_PER_SECTION = 100; // 差分通知メールに載せる区分（追加・変更・削除）ごとの明細の上限件数
 
 
 // =============================================================================
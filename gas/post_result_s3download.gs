@@ -236,16 +236,19 @@ function compareAndHighlightDifferences_(sheetToday, sheetYesterday) {
     return "比較対象のデータがありませんでした。";
   }
 
-  const yesterdayMap = new Map(yesterdayValues.map(row => [`${row[1]}|${row[2]}`, row]));
+  // 比較キー（記事URL|広告URL）と見出し行は一度だけ取り出して使い回す
+  const rowKey = row => `${row[1]}|${row[2]}`;
+  const headerValues = sheetToday.getRange(1, 1, 1, RESULT_SHEET_COLUMN_COUNT).getValues()[0];
+  const yesterdayMap = new Map(yesterdayValues.map(row => [rowKey(row), row]));
   const results = { added: [], changed: [], deleted: [] };
   const backgrounds = todayValues.map(() => Array(RESULT_SHEET_COLUMN_COUNT).fill(null));
   const fontColors = todayValues.map(() => Array(RESULT_SHEET_COLUMN_COUNT).fill('black'));
   const fontLines = todayValues.map(() => Array(RESULT_SHEET_COLUMN_COUNT).fill('none'));
 
   todayValues.forEach((todayRow, rowIndex) => {
-    const key = `${todayRow[1]}|${todayRow[2]}`;
-    if (yesterdayMap.has(key)) {
-      const yesterdayRow = yesterdayMap.get(key);
+    const key = rowKey(todayRow);
+    const yesterdayRow = yesterdayMap.get(key);
+    if (yesterdayRow !== undefined) {
       let isRowDifferent = false;
       let changes = [];
       for (let colIndex = 0; colIndex < RESULT_SHEET_COLUMN_COUNT; colIndex++) {
@@ -254,7 +257,7 @@ function compareAndHighlightDifferences_(sheetToday, sheetYesterday) {
         if (String(todayRow[colIndex]).trim() !== String(yesterdayRow[colIndex]).trim()) {
           isRowDifferent = true;
           fontColors[rowIndex][colIndex] = 'red';
-          changes.push(`  - ${sheetToday.getRange(1, colIndex + 1).getValue()}: 「${yesterdayRow[colIndex]}」->「${todayRow[colIndex]}」`);
+          changes.push(`  - ${headerValues[colIndex]}: 「${yesterdayRow[colIndex]}」->「${todayRow[colIndex]}」`);
         }
       }
       if (isRowDifferent) {
@@ -297,25 +300,25 @@ function formatDiffEmailBody_(results) {
   if (results.added.length === 0 && results.changed.length === 0 && results.deleted.length === 0) {
     return "前回チェック時からの差分はありませんでした。";
   }
-  let body = "前回チェック時から以下の差分が検出されました。";
+  // 本文は配列に積んで最後に一度だけ連結し、各区分の明細は上限件数までに抑える（残りはスプレッドシートで確認）
+  const parts = ["前回チェック時から以下の差分が検出されました。"];
 
   // ★修正: item.statusCode を item.checkResult に変更し、表示名は「確認結果」のままにする
   const formatItem = item => `  - 記事URL: ${item.pageUrl}\n    広告URL: ${item.link}\n    確認結果: ${item.checkResult}`;
-
-  if (results.added.length > 0) {
-    body += `\n▼ 追加 (${results.added.length}件)\n`;
-    body += results.added.map(formatItem).join('\n\n');
-  }
-  if (results.changed.length > 0) {
-    body += `\n\n▼ 変更 (${results.changed.length}件)\n`;
-    // ★修正: 共通情報と変更詳細の間に改行と「■変更」を挿入
-    body += results.changed.map(item => `${formatItem(item)}\n\n  ■ 変更内容\n${item.details}`).join('\n\n');
-  }
-  if (results.deleted.length > 0) {
-    body += `\n\n▼ 削除 (${results.deleted.length}件)\n`;
-    body += results.deleted.map(formatItem).join('\n\n');
-  }
-  return body;
+  const appendSection = (heading, items, format) => {
+    if (items.length === 0) return;
+    const lines = items.slice(0, MAX_DIFF_ITEMS_PER_SECTION).map(format);
+    if (items.length > MAX_DIFF_ITEMS_PER_SECTION) {
+      lines.push(`  ... 他 ${items.length - MAX_DIFF_ITEMS_PER_SECTION} 件`);
+    }
+    parts.push(`${heading} (${items.length}件)\n`, lines.join('\n\n'));
+  };
+
+  appendSection('\n▼ 追加', results.added, formatItem);
+  // ★修正: 共通情報と変更詳細の間に改行と「■変更」を挿入
+  appendSection('\n\n▼ 変更', results.changed, item => `${formatItem(item)}\n\n  ■ 変更内容\n${item.details}`);
+  appendSection('\n\n▼ 削除', results.deleted, formatItem);
+  return parts.join('');
 }
 
 /**
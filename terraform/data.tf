@@ -17,6 +17,9 @@ data "archive_file" "lambda_function_zip" {
   
   # Terraformが実行される一時ディレクトリにZIPファイルが作成されます
   output_path = "${path.cwd}/build/lambda_function.zip"
+
+  # 実行環境のumaskでファイル権限が変わるとZIPのハッシュも変わり不要な再デプロイになるため、権限を固定します
+  output_file_mode = "0644"
 }
 
 # SNSトピックのポリシードキュメントを作成
@@ -39,15 +39,16 @@ resource "aws_lambda_function" "link_checker_lambda" {
   # Lambda関数内で使用する環境変数を定義します
   environment {
     variables = {
-      S3_OUTPUT_BUCKET   = aws_s3_bucket.s3_link_checker.id # 結果を出力するバケット
-      LOG_LEVEL          = var.lambda_log_level
-      REQUEST_TIMEOUT    = var.lambda_request_timeout
-      MAX_RETRIES        = var.lambda_max_retries
-      BACKOFF_FACTOR     = var.lambda_backoff_factor
-      MAX_WORKERS        = var.lambda_max_workers
-      CRAWL_WAIT_SECONDS = var.lambda_crawl_wait_seconds
-      NG_WORDS           = var.lambda_ng_words
-      EXCLUDE_STRINGS    = var.lambda_exclude_strings
+      S3_OUTPUT_BUCKET         = aws_s3_bucket.s3_link_checker.id # 結果を出力するバケット
+      LOG_LEVEL                = var.lambda_log_level
+      REQUEST_TIMEOUT          = var.lambda_request_timeout
+      MAX_RETRIES              = var.lambda_max_retries
+      BACKOFF_FACTOR           = var.lambda_backoff_factor
+      MAX_WORKERS              = var.lambda_max_workers
+      CRAWL_WAIT_SECONDS       = var.lambda_crawl_wait_seconds
+      NG_WORDS                 = var.lambda_ng_words
+      EXCLUDE_STRINGS          = var.lambda_exclude_strings
+      MAX_CONNECTIONS_PER_HOST = var.lambda_max_connections_per_host
     }
   }
 
@@ -5,16 +5,26 @@ import json
 import urllib.parse
 import logging
 import time
+import threading
+import socket
+import random
 import re
+import html
+import codecs
 import boto3
+import soupsieve
 import requests
 import csv
 import io
-from bs4 import BeautifulSoup
+import gzip
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from collections import namedtuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # --- グローバル設定 ---
 logger = logging.getLogger()
@@ -28,12 +38,69 @@ HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 PER_ARTICLE_WAIT_SECONDS = 1
 SUCCESS_STATUS_LOWER_BOUND = 200
 SUCCESS_STATUS_UPPER_BOUND = 400
+CONNECTION_WARMUP_TIMEOUT_SECONDS = 2
+# 名前解決結果を再利用する秒数（同じホストへ新しい接続を張るたびにDNSへ問い合わせない）
+DNS_CACHE_TTL_SECONDS = 300
+# 1回の実行全体で許容するHTTPリトライの合計回数（障害時に全リンクがリトライとバックオフを繰り返すのを防ぐ）
+RETRY_BUDGET_PER_RUN = 100
+# 同時にクロールするブログ数の上限
+MAX_CONCURRENT_BLOG_CRAWLS = 4
+# 保持するホスト別コネクションプールの数（既定の10では広告リンク先ホストが多い場合にプールが追い出され、keep-aliveが切れる）
+HTTP_POOL_CONNECTIONS = 64
+AD_NOTICE_TEXT = "※一部、広告・宣伝が含まれます。"
+AD_NOTICE_RE = re.compile(re.escape(AD_NOTICE_TEXT))
+ARTICLE_CLASS_RE = re.compile(r'article')
+META_REFRESH_URL_RE = re.compile(r'url=(.+)')
+# hrefごとに.lower()で文字列を作らずに判定するため、スキップ対象の先頭パターンを事前コンパイルしておく
+JAVASCRIPT_HREF_RE = re.compile(r'javascript:', re.I)
+SKIPPED_HREF_RE = re.compile(r'#|javascript:', re.I)
+URL_CACHE_SIZE = 4096
+CHECKABLE_URL_SCHEMES = ('http://', 'https://')
+# 正常ステータスでもNGとするリンク先ドメイン
+NG_DESTINATION_NETLOCS = frozenset({"jass-net.com"})
+# meta refreshは<head>内に置かれるため、レスポンス先頭のこのバイト数だけを走査する
+META_REFRESH_SCAN_BYTES = 65536
+# meta refreshやNGワードの判定対象になり得る本文のContent-Type（空の場合もHTMLとして扱う）
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+# 本文を使わないレスポンスでも、このバイト数以下なら読み切ってから閉じ、keep-alive接続をプールへ戻す
+# （未読のまま閉じると接続ごと破棄され、同じホストへの次のリクエストで再度TCP/TLS接続が必要になる）
+RESPONSE_DRAIN_MAX_BYTES = 65536
+# 仕様上本文を持たないステータスコード
+NO_BODY_STATUS_CODES = (204, 304)
+META_TAG_RE = re.compile(rb'<meta\b[^>]*>', re.I)
+META_HTTP_EQUIV_REFRESH_RE = re.compile(rb'http-equiv\s*=\s*["\']?[^"\'>\s]*refresh', re.I)
+# Content-Typeヘッダーにcharsetが無い場合のみ、先頭のこのバイト数から<meta>の文字コード宣言を探す
+CHARSET_SCAN_BYTES = 4096
+META_CHARSET_RE = re.compile(rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+META_CONTENT_ATTR_RE = re.compile(rb'(?<![\w-])content\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+
+# livedoorの一覧ページでは記事要素と<a>以外を参照しないため、それ以外のDOMは構築しない
+LIVEDOOR_LIST_PAGE_STRAINER = SoupStrainer(['article', 'a'])
+# CSSセレクタは呼び出しごとに解釈させず、モジュール読み込み時に1度だけコンパイルする
+LIVEDOOR_ARTICLE_TITLE_LINK_SELECTOR = soupsieve.compile('h1.article-title a, h2.article-title a, a.article-title-link')
+LIVEDOOR_NEXT_PAGE_LINK_SELECTOR = soupsieve.compile('a.next, a.pager-next')
+LIVEDOOR_NEXT_PAGE_LINK_TEXTS = ("»", "次へ")
+
+# リンクチェック1件分の結果（辞書より生成・属性参照が軽い）
+# etag/last_modifiedは次回実行で条件付きリクエストに使う検証子で、正常と判定できた場合だけ設定する
+CheckResult = namedtuple('CheckResult', ['status_code', 'final_url', 'error_message', 'etag', 'last_modified'], defaults=(None, None))
 
 # ★★★【変更】ご指定のCSVヘッダー形式に修正 ★★★
 CSV_HEADERS = [
     "スプレッドシート記載のリンク", "ブログ記事URL", "アフィリエイト広告リンク",
     "確認結果", "ステータスコード", "アフィリエイト広告リンク先URL", "エラーメッセージ", "タイムスタンプ"
 ]
+# CSV1行分の結果。列はCSV_HEADERSと同じ順で、行ごとに辞書を持たずにそのままcsv.writerへ渡す
+ResultRow = namedtuple('ResultRow', [
+    'spreadsheet_link', 'blog_article_url', 'affiliate_link',
+    'check_result', 'status_code', 'final_url', 'error_message', 'timestamp'
+])
+
+# ブログページ・広告リンクのETag/Last-Modifiedと結果を次回実行に引き継ぐキャッシュ（トリガー対象のurls_list.jsonとは別キー）
+# 本文はgzip圧縮して保存する（Lambda自身しか読まないため、CSVのような互換性の制約が無い）
+PAGE_CACHE_KEY = "page_cache.json.gz"
+# 解析結果の形式を変えた場合に古いキャッシュを読み捨てるためのバージョン
+PAGE_CACHE_VERSION = 3
 
 # --- 環境変数からの設定読み込み ---
 try:
@@ -43,128 +110,416 @@ try:
     BACKOFF_FACTOR = float(os.environ['BACKOFF_FACTOR'])
     MAX_WORKERS = int(os.environ['MAX_WORKERS'])
     CRAWL_WAIT_SECONDS = int(os.environ['CRAWL_WAIT_SECONDS'])
+    # リンクチェックで同一ホストへ同時に送るリクエスト数の上限（短時間の集中アクセスでブロック・429応答を受けるのを避ける）
+    MAX_CONNECTIONS_PER_HOST = int(os.environ.get('MAX_CONNECTIONS_PER_HOST', '4'))
     if not S3_OUTPUT_BUCKET:
         raise ValueError("S3_OUTPUT_BUCKET is set but empty.")
+    # 0ではセマフォを取得できず全リンクチェックが待ち続け、負の値では各チェックが例外になるため、起動時に弾く
+    if MAX_CONNECTIONS_PER_HOST < 1:
+        raise ValueError(f"MAX_CONNECTIONS_PER_HOST must be at least 1 (got {MAX_CONNECTIONS_PER_HOST}).")
 except (KeyError, ValueError, TypeError) as e:
     logger.error(f"必須の環境変数が設定されていないか、値が不正です。エラー: {e}")
     raise
 
+# 任意設定（カンマ区切り）は実行のたびに分割し直さないよう、コンテナ起動時に一度だけ解析する
+NG_WORDS = [word.strip() for word in os.environ.get('NG_WORDS', '').split(',') if word.strip()]
+EXCLUDE_STRINGS = [s.strip() for s in os.environ.get('EXCLUDE_STRINGS', '').split(',') if s.strip()]
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+LINK_CHECK_REQUEST_HEADERS = {'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8', 'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8'}
+
 # --- 補助関数 (変更なし) ---
 
-def requests_retry_session(retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=HTTP_RETRY_STATUS_CODES, session=None):
+RETRY_BUDGET = {'remaining': RETRY_BUDGET_PER_RUN}
+RETRY_BUDGET_LOCK = threading.Lock()
+
+def reset_retry_budget():
+    with RETRY_BUDGET_LOCK:
+        RETRY_BUDGET['remaining'] = RETRY_BUDGET_PER_RUN
+
+def consume_retry_budget():
+    with RETRY_BUDGET_LOCK:
+        if RETRY_BUDGET['remaining'] <= 0: return False
+        RETRY_BUDGET['remaining'] -= 1
+        return True
+
+class JitteredRetry(Retry):
+    # 多数のリンクが同時に失敗しても再送のタイミングが揃わないよう、待ち時間に揺らぎ（full jitter）を加える
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+class BudgetedRetry(JitteredRetry):
+    # 実行全体のリトライ予算を使い切った後は、それ以上リトライせずに即座に失敗させる
+    # （リトライ回数の上限に達した最後の失敗は再送しないため、予算から差し引かない）
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        if consume_retry_budget(): return retry
+        return super(BudgetedRetry, self.new(total=0)).increment(*args, **kwargs)
+
+def requests_retry_session(retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=HTTP_RETRY_STATUS_CODES, session=None, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=MAX_WORKERS, retry_class=BudgetedRetry):
     session = session or requests.Session()
-    retry = Retry(
+    retry = retry_class(
         total=retries, read=retries, connect=retries,
         backoff_factor=backoff_factor, status_forcelist=status_forcelist,
         respect_retry_after_header=True
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # セッションを使う全スレッドが同一ホストへ同時接続してもプールから溢れないようにする
+    # http/httpsで同じアダプタ（＝同じPoolManager）を共有し、ホスト単位のプールを一元管理する
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=False)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
 
-def get_html_content(url):
+# 同じベースURLとhrefの組み合わせはページをまたいで繰り返し現れるため、URL操作の結果をキャッシュする
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def cached_urljoin(base_url, href):
+    return urllib.parse.urljoin(base_url, href)
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def cached_urlparse(url):
+    return urllib.parse.urlparse(url)
+
+# Pythonは名前解決結果をキャッシュしないため、接続のたびに発生するgetaddrinfoを一定時間キャッシュする
+# （失敗した結果はキャッシュせず、次回の接続で改めて問い合わせる）
+SYSTEM_GETADDRINFO = socket.getaddrinfo
+DNS_CACHE = {}
+DNS_CACHE_LOCK = threading.Lock()
+
+def cached_getaddrinfo(*args, **kwargs):
+    cache_key = (args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    cached_entry = DNS_CACHE.get(cache_key)
+    if cached_entry and cached_entry[0] > now:
+        return cached_entry[1]
+    addresses = SYSTEM_GETADDRINFO(*args, **kwargs)
+    with DNS_CACHE_LOCK:
+        # キャッシュはウォームスタートの実行間で引き継がれるため、登録のたびに期限切れのエントリを取り除き、過去に解決した全ホスト分が溜まり続けないようにする
+        for expired_key in [key for key, (expires_at, _) in DNS_CACHE.items() if expires_at <= now]:
+            del DNS_CACHE[expired_key]
+        DNS_CACHE[cache_key] = (now + DNS_CACHE_TTL_SECONDS, addresses)
+    return addresses
+
+socket.getaddrinfo = cached_getaddrinfo
+
+def link_check_key(link):
+    # スキーム・ホストの大文字小文字とフラグメントだけが異なるURLは同じリンク先として1度だけチェックする
+    # （クエリの並び順は意味を持つサイトがあるため正規化しない）
+    parsed = cached_urlparse(link)
+    return urllib.parse.urlunparse(parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment=''))
+
+# コネクションプールを呼び出し間（ウォームスタート時は実行間）で再利用するための共有セッション
+HTTP_SESSION = requests_retry_session()
+# ブログページの取得はリトライ予算の対象外とし、リンクチェックの失敗で予算が尽きた後もページの一時的なエラーは再送する
+# （ページ取得に失敗するとそのブログの残りの行がCSVから抜け、GAS側で削除として扱われるため）
+PAGE_SESSION = requests_retry_session(pool_maxsize=MAX_CONCURRENT_BLOG_CRAWLS, retry_class=JitteredRetry)
+# 全リクエスト共通のUser-Agentはセッションに1度だけ設定する
+HTTP_SESSION.headers['User-Agent'] = USER_AGENT
+PAGE_SESSION.headers['User-Agent'] = USER_AGENT
+# ワーカースレッドも同様に、実行ごと・ページごとに生成し直さず全体で1つのプールを使い回す
+LINK_CHECK_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+# ブログのクロールはリンクチェックのワーカーを占有しないよう別のプールで実行する
+BLOG_CRAWL_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BLOG_CRAWLS)
+HOST_SEMAPHORES = {}
+HOST_SEMAPHORES_LOCK = threading.Lock()
+
+def warm_up_connections(urls, session):
+    # チェック開始前に各オリジンへ接続しておき、DNS解決とTLSハンドシェイクを先に済ませる
+    origins = set()
+    for url in urls:
+        parsed = cached_urlparse(url)
+        if parsed.scheme in ('http', 'https') and parsed.netloc:
+            origins.add(f"{parsed.scheme}://{parsed.netloc}/")
+    if not origins: return
+
+    # 事前接続はリトライ（Retry-Afterの待機やリトライ予算の消費）をさせないよう、セッションを通さずに送る。
+    # ただし後続のリクエストと同じプール（＝同じkeep-alive接続）を使うよう、接続先のプールはアダプタと同じ方法で取得する
+    adapter = session.get_adapter('https://')
+
+    def warm_up(origin):
+        try:
+            warm_up_request = session.prepare_request(requests.Request('HEAD', origin))
+            # 検証設定・プロキシは環境変数（REQUESTS_CA_BUNDLE等）も反映されるため、session.requestと同じ方法で求める
+            settings = session.merge_environment_settings(origin, {}, None, None, None)
+            pool = adapter.get_connection_with_tls_context(warm_up_request, settings['verify'], proxies=settings['proxies'], cert=settings['cert'])
+            pool.urlopen('HEAD', '/', headers=warm_up_request.headers, timeout=CONNECTION_WARMUP_TIMEOUT_SECONDS, retries=False, redirect=False)
+        except (Urllib3HTTPError, requests.exceptions.RequestException) as e:
+            logger.debug("事前接続に失敗しました %s: %s", origin, e)
+
+    # 完了は待たずにリンクチェックの投入へ進む（同じプールで先に実行されるため、後続のチェックより先に接続が張られる）
+    for origin in origins:
+        LINK_CHECK_EXECUTOR.submit(warm_up, origin)
+    logger.info(f"事前接続を開始しました。オリジン数: {len(origins)}")
+
+def get_page_result(url, analyze, previous_pages, current_pages):
+    # 前回実行時のETag/Last-Modifiedで条件付きGETを行い、304 Not Modifiedなら本文の取得と解析を省略して前回の解析結果を使う
+    cached_page = previous_pages.get(url)
+    request_headers = {}
+    if cached_page:
+        if cached_page.get('etag'): request_headers['If-None-Match'] = cached_page['etag']
+        if cached_page.get('last_modified'): request_headers['If-Modified-Since'] = cached_page['last_modified']
     try:
-        session = requests_retry_session()
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+        session = PAGE_SESSION
+        response = session.get(url, timeout=REQUEST_TIMEOUT, headers=request_headers)
+        if response.status_code == 304 and cached_page:
+            logger.debug("ページ未更新のため前回の解析結果を使用します: %s", url)
+            current_pages[url] = cached_page
+            return cached_page['result']
         response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return response.text
+        response.encoding = detect_response_encoding(response)
+        html_content = response.text
     except requests.exceptions.RequestException as e:
         logger.error(f"URL取得エラー {url}: {e}")
         return None
+    result = analyze(html_content, url)
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    if etag or last_modified:
+        current_pages[url] = {'etag': etag, 'last_modified': last_modified, 'result': result}
+    return result
+
+def load_page_cache():
+    try:
+        response = s3_client.get_object(Bucket=S3_OUTPUT_BUCKET, Key=PAGE_CACHE_KEY)
+        page_cache = json.loads(gzip.decompress(response['Body'].read()))
+    except Exception as e:
+        # 初回実行時などキャッシュが無い場合は全ページを通常どおり取得する
+        logger.info(f"ページキャッシュを読み込めなかったため、全ページを取得します: {e}")
+        return {}, {}
+    if page_cache.get('version') != PAGE_CACHE_VERSION: return {}, {}
+    # 広告リンクの結果はNGワードの判定結果を含むため、NGワードが変わった場合は使わない
+    links = page_cache.get('links', {}) if page_cache.get('ng_words') == sorted(NG_WORDS) else {}
+    return page_cache.get('pages', {}), links
+
+def save_page_cache(pages, links):
+    try:
+        body = json.dumps({'version': PAGE_CACHE_VERSION, 'ng_words': sorted(NG_WORDS), 'pages': pages, 'links': links}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        s3_client.put_object(Bucket=S3_OUTPUT_BUCKET, Key=PAGE_CACHE_KEY, Body=gzip.compress(body, compresslevel=6), ContentType='application/json', ContentEncoding='gzip')
+        logger.info(f"ページキャッシュを保存しました。ページ数: {len(pages)}、リンク数: {len(links)}")
+    except Exception as e:
+        # キャッシュは最適化のためだけのものなので、保存に失敗してもチェック結果には影響させない
+        logger.warning(f"ページキャッシュの保存に失敗しました: {e}")
+
+def collect_link_cache(link_check_futures):
+    # 正常に到達でき、検証子を返したリンクだけを次回の条件付きリクエスト用に残す
+    links = {}
+    for cache_key, future in link_check_futures.items():
+        if future.exception() is not None: continue
+        check_result = future.result()
+        if check_result.error_message is None and (check_result.etag or check_result.last_modified):
+            links[cache_key] = list(check_result)
+    return links
+
+def detect_response_encoding(response):
+    # ヘッダー → <meta>宣言の順に確認し、どちらも無い場合はUTF-8として読めるかを確かめる
+    # Pythonが扱えない文字コード名（utf8mb4など）が宣言されている場合は、宣言が無いものとして次の判定へ進む
+    if 'charset' in response.headers.get('Content-Type', '').lower() and response.encoding:
+        try:
+            codecs.lookup(response.encoding)
+            return response.encoding
+        except LookupError:
+            pass
+    charset_match = META_CHARSET_RE.search(response.content, 0, CHARSET_SCAN_BYTES)
+    if charset_match:
+        declared_charset = charset_match.group(1).decode('ascii', errors='ignore')
+        try:
+            return codecs.lookup(declared_charset).name
+        except LookupError:
+            pass
+    # 宣言の無いページも大半はUTF-8のため、厳密なUTF-8デコードに失敗した場合だけ文字コード推定（本文全体の走査）を行う
+    try:
+        response.content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return response.apparent_encoding
 
-def extract_ad_links(html_content, base_url):
+def parse_html(html_content, parse_only=None):
+    # 1ページにつき1回だけDOMを構築し、各抽出関数で使い回す
     if not html_content: return None
-    soup = BeautifulSoup(html_content, 'html.parser')
+    return BeautifulSoup(html_content, 'html.parser', parse_only=parse_only)
+
+def extract_ad_links(soup, base_url):
+    if soup is None: return None
     body = soup.body
     if not body: return None
-    ad_notice_texts = body.find_all(string=re.compile(r"※一部、広告・宣伝が含まれます。"))
+    ad_notice_texts = body.find_all(string=AD_NOTICE_RE)
     if not ad_notice_texts: return None
     links = set()
-    for notice_text in ad_notice_texts:
-        for next_element in notice_text.find_all_next():
-            if next_element.name == 'a' and next_element.has_attr('href'):
-                href = next_element['href']
-                if href and not href.lower().startswith('javascript:'):
-                    full_url = urllib.parse.urljoin(base_url, href)
-                    if full_url.split('#')[0] != base_url.split('#')[0]:
-                        links.add(full_url)
-                    break
-    return [link for link in links if not urllib.parse.urlparse(link).fragment]
-
-def find_hatena_next_page_link(html_content, base_url):
-    if not html_content: return None
-    soup = BeautifulSoup(html_content, 'html.parser')
+    page_url = base_url.split('#')[0]
+    # 広告表記ごとに後続要素を走査し直すと表記の数だけ文書を舐めるため、最初の表記から1回だけ走査し、
+    # 「直前の表記に対応するリンクが未確定」かどうかを保持して次の有効な<a href>を拾う
+    notice_ids = {id(notice_text) for notice_text in ad_notice_texts}
+    waiting_for_link = True
+    for next_element in ad_notice_texts[0].next_elements:
+        if id(next_element) in notice_ids:
+            waiting_for_link = True
+        elif waiting_for_link and next_element.name == 'a' and next_element.has_attr('href'):
+            href = next_element['href']
+            if href and not JAVASCRIPT_HREF_RE.match(href):
+                full_url = cached_urljoin(base_url, href)
+                # mailto:やtel:などHTTPでチェックできないリンクは、表記に対応するリンクとしては扱うがチェック対象には含めない
+                if full_url.split('#')[0] != page_url and full_url.lower().startswith(CHECKABLE_URL_SCHEMES):
+                    links.add(full_url)
+                waiting_for_link = False
+    return [link for link in links if not link.partition('#')[2]]
+
+def find_hatena_next_page_link(soup, base_url):
+    if soup is None: return None
     next_link_tag = soup.find('a', rel='next', href=True)
     if next_link_tag:
-        return urllib.parse.urljoin(base_url, next_link_tag['href'])
+        return cached_urljoin(base_url, next_link_tag['href'])
     return None
 
-def extract_livedoor_article_links(html_content, base_url):
+def extract_livedoor_article_links(soup, base_url):
     links = set()
-    if not html_content: return list(links)
-    soup = BeautifulSoup(html_content, 'html.parser')
-    for article in soup.find_all('article', class_=re.compile(r'article')):
-        title_link = article.select_one('h1.article-title a, h2.article-title a, a.article-title-link')
+    if soup is None: return list(links)
+    for article in soup.find_all('article', class_=ARTICLE_CLASS_RE):
+        title_link = LIVEDOOR_ARTICLE_TITLE_LINK_SELECTOR.select_one(article)
         if title_link and title_link.has_attr('href'):
             href = title_link['href']
-            if href and not href.startswith('#') and not href.lower().startswith('javascript:'):
-                full_url = urllib.parse.urljoin(base_url, href)
-                links.add(full_url.split('#')[0])
+            if href and not SKIPPED_HREF_RE.match(href):
+                full_url = cached_urljoin(base_url, href)
+                # mailto:などHTTPで取得できないリンクは記事ページとして巡回しない
+                if full_url.lower().startswith(CHECKABLE_URL_SCHEMES):
+                    links.add(full_url.split('#')[0])
     return list(links)
 
-def find_livedoor_next_page_link(html_content, base_url):
-    if not html_content: return None
-    soup = BeautifulSoup(html_content, 'html.parser')
-    next_link_tag = soup.select_one('a.next, a.pager-next, a:-soup-contains("»"), a:-soup-contains("次へ")')
+def find_livedoor_next_page_link(soup, base_url):
+    if soup is None: return None
+    # クラス指定で見つかる場合はリンク文字列を比較せず、見つからない場合だけ<a>の文字列から探す
+    next_link_tag = LIVEDOOR_NEXT_PAGE_LINK_SELECTOR.select_one(soup)
+    if next_link_tag is None:
+        next_link_tag = next((a_tag for a_tag in soup.find_all('a') if any(text in a_tag.get_text() for text in LIVEDOOR_NEXT_PAGE_LINK_TEXTS)), None)
     if next_link_tag and next_link_tag.has_attr('href'):
-        return urllib.parse.urljoin(base_url, next_link_tag['href'])
+        return cached_urljoin(base_url, next_link_tag['href'])
     return None
 
-def check_link_status(url, ng_words=None):
-    session = requests_retry_session()
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36', 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8', 'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8'}
+def analyze_hatena_page(html_content, page_url):
+    page_soup = parse_html(html_content)
+    ad_links = extract_ad_links(page_soup, page_url) if AD_NOTICE_TEXT in html_content else None
+    return {'ad_links': ad_links, 'next_page': find_hatena_next_page_link(page_soup, page_url)}
+
+def analyze_livedoor_list_page(html_content, page_url):
+    list_page_soup = parse_html(html_content, parse_only=LIVEDOOR_LIST_PAGE_STRAINER)
+    return {'article_urls': extract_livedoor_article_links(list_page_soup, page_url), 'next_page': find_livedoor_next_page_link(list_page_soup, page_url)}
+
+def analyze_livedoor_article(html_content, page_url):
+    # 広告表記の無い記事はDOMを構築しても抽出結果が無いため、パース自体を省略する
+    if AD_NOTICE_TEXT not in html_content: return {'ad_links': None}
+    return {'ad_links': extract_ad_links(parse_html(html_content), page_url)}
+
+def find_meta_refresh_content(raw_content, encoding):
+    # DOMを構築せず、生のバイト列から<meta http-equiv="refresh">のcontent属性を取り出す
+    for tag_match in META_TAG_RE.finditer(raw_content, 0, META_REFRESH_SCAN_BYTES):
+        tag = tag_match.group(0)
+        if not META_HTTP_EQUIV_REFRESH_RE.search(tag): continue
+        content_match = META_CONTENT_ATTR_RE.search(tag)
+        if not content_match: return None
+        content_value = next(group for group in content_match.groups() if group is not None)
+        try:
+            decoded_content = content_value.decode(encoding or 'utf-8', errors='replace')
+        except LookupError:
+            decoded_content = content_value.decode('utf-8', errors='replace')
+        return html.unescape(decoded_content)
+    return None
+
+def compile_ng_words_pattern(ng_words):
+    # 全NGワードを1つの正規表現にまとめ、ページ本文を1回の走査で判定できるようにする
+    if not ng_words: return None
+    return re.compile('|'.join(re.escape(word) for word in sorted(set(ng_words), key=len, reverse=True)))
+
+NG_WORDS_PATTERN = compile_ng_words_pattern(NG_WORDS)
+
+def is_html_response(response):
+    content_type = response.headers.get('Content-Type', '').lower()
+    return not content_type or content_type.startswith(HTML_CONTENT_TYPES)
+
+def release_response(response):
+    content_length = response.headers.get('Content-Length', '')
+    if response.status_code in NO_BODY_STATUS_CODES or (content_length.isdigit() and int(content_length) <= RESPONSE_DRAIN_MAX_BYTES):
+        try:
+            response.content
+        except requests.exceptions.RequestException:
+            pass
+    response.close()
+
+# セマフォはリクエストを送る前のURLのホスト単位で取得する。meta refreshの遷移先は改めて取得し直すが、
+# requestsが内部で追うHTTPリダイレクト（3xx）の転送先は、転送元ホストのセマフォを保持したまま接続する
+def get_host_semaphore(url):
+    netloc = cached_urlparse(url).netloc
+    semaphore = HOST_SEMAPHORES.get(netloc)
+    if semaphore is None:
+        with HOST_SEMAPHORES_LOCK:
+            semaphore = HOST_SEMAPHORES.setdefault(netloc, threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST))
+    return semaphore
+
+def check_link_status(url, ng_words_pattern=None, cached_result=None):
+    session = HTTP_SESSION
     current_url = url
+    # 前回正常だったリンクは検証子付きの条件付きリクエストにし、304 Not Modifiedなら本文を受け取らず前回の結果を使う
+    request_headers = LINK_CHECK_REQUEST_HEADERS
+    if cached_result:
+        request_headers = dict(LINK_CHECK_REQUEST_HEADERS)
+        if cached_result.etag: request_headers['If-None-Match'] = cached_result.etag
+        if cached_result.last_modified: request_headers['If-Modified-Since'] = cached_result.last_modified
     for _ in range(MAX_META_REFRESH_REDIRECTS):
-        try:
-            response = session.get(current_url, timeout=REQUEST_TIMEOUT, headers=headers, allow_redirects=True)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            page_content = response.text
-            soup = BeautifulSoup(page_content, 'html.parser')
-            refresh_tag = soup.find('meta', attrs={'http-equiv': re.compile(r'refresh', re.I)})
-            if refresh_tag and refresh_tag.get('content'):
-                content_attr = refresh_tag['content'].lower()
-                match = re.search(r'url=(.+)', content_attr)
-                if match:
-                    next_url = match.group(1).strip().strip("'\"")
-                    current_url = urllib.parse.urljoin(response.url, next_url)
-                    continue
-            if ng_words:
-                for word in ng_words:
-                    if word in page_content:
-                        return {"status_code": response.status_code, "final_url": response.url, "error_message": f"ページ内にNGワードが含まれています: '{word}'"}
-            return {"status_code": response.status_code, "final_url": response.url, "error_message": None}
-        except requests.exceptions.HTTPError as e:
-            return {"status_code": e.response.status_code if e.response else None, "final_url": e.response.url if e.response else current_url, "error_message": str(e)}
-        except requests.exceptions.RequestException as e:
-            return {"status_code": None, "final_url": current_url, "error_message": str(e)}
-    return {"status_code": None, "final_url": current_url, "error_message": "Meta refresh redirect limit exceeded"}
+        # 同一ホスト（ASPの計測サーバ等）へ全ワーカーが同時に集中しないよう、ホストごとの同時接続数を制限する
+        with get_host_semaphore(current_url):
+            try:
+                # 本文はステータスとContent-Typeを確認してから必要な場合だけ読み込む
+                response = session.get(current_url, timeout=REQUEST_TIMEOUT, headers=request_headers, allow_redirects=True, stream=True)
+                if response.status_code == 304 and cached_result:
+                    release_response(response)
+                    # 検証子はリダイレクト先にも転送されるため、304は前回と同じ最終URLで返された場合だけ前回の結果として扱う
+                    # （広告終了などで転送先が変わった場合、新しい転送先の304を前回のOKと取り違えないよう、条件なしで取得し直す）
+                    if response.url == cached_result.final_url:
+                        return cached_result._replace(final_url=response.url)
+                    logger.debug("リダイレクト先が前回と異なるため条件なしで再取得します: %s -> %s", current_url, response.url)
+                    request_headers = LINK_CHECK_REQUEST_HEADERS
+                    response = session.get(current_url, timeout=REQUEST_TIMEOUT, headers=request_headers, allow_redirects=True, stream=True)
+                response.raise_for_status()
+                # 検証子はHTTPリダイレクト後の最終URLのもの（次回は最終URLが一致した場合だけ304を受け入れる）。meta refresh後は保持しない
+                validators = (response.headers.get('ETag'), response.headers.get('Last-Modified')) if current_url == url else (None, None)
+                if not ng_words_pattern and not is_html_response(response):
+                    # NGワード判定が無く、meta refreshもあり得ない（画像・PDF等）場合は本文を使わない（大きい本文はダウンロードせずに接続ごと閉じる）
+                    release_response(response)
+                    return CheckResult(response.status_code, response.url, None, *validators)
+                response.encoding = detect_response_encoding(response)
+                refresh_content = find_meta_refresh_content(response.content, response.encoding)
+                if refresh_content:
+                    content_attr = refresh_content.lower()
+                    match = META_REFRESH_URL_RE.search(content_attr)
+                    if match:
+                        next_url = match.group(1).strip().strip("'\"")
+                        current_url = cached_urljoin(response.url, next_url)
+                        # meta refresh先へのリクエストには最初のURLの検証子を付けない
+                        request_headers = LINK_CHECK_REQUEST_HEADERS
+                        continue
+                if ng_words_pattern:
+                    ng_word_match = ng_words_pattern.search(response.text)
+                    if ng_word_match:
+                        return CheckResult(response.status_code, response.url, f"ページ内にNGワードが含まれています: '{ng_word_match.group(0)}'")
+                return CheckResult(response.status_code, response.url, None, *validators)
+            except requests.exceptions.HTTPError as e:
+                # エラーページの本文は使わないため、小さい場合だけ読み捨てて接続を解放する
+                if e.response is not None: release_response(e.response)
+                return CheckResult(e.response.status_code if e.response else None, e.response.url if e.response else current_url, str(e))
+            except requests.exceptions.RequestException as e:
+                return CheckResult(None, current_url, str(e))
+    return CheckResult(None, current_url, "Meta refresh redirect limit exceeded")
 
 # --- メイン処理 (Lambdaハンドラ) ---
 
 def lambda_handler(event, context):
+    # 異常終了時に共有プールへ投入済みの処理を止められるよう、投入したFutureの置き場は処理の外側で用意する
+    blog_crawl_futures = []
+    link_check_futures = {}
+    crawl_stopped = threading.Event()
     try:
-        logger.info(f"イベント受信: {json.dumps(event)}")
+        # イベント全体のJSON化はINFOが無効な場合に無駄になるため、出力される場合のみ行う
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("イベント受信: %s", json.dumps(event, ensure_ascii=False))
         
-        ng_words_str = os.environ.get('NG_WORDS', '')
-        ng_words = [word.strip() for word in ng_words_str.split(',') if word.strip()]
-        exclude_strings_str = os.environ.get('EXCLUDE_STRINGS', '')
-        exclude_strings = [s.strip() for s in exclude_strings_str.split(',') if s.strip()]
-        if exclude_strings:
-            logger.info(f"チェック対象から除外する文字列: {exclude_strings}")
+        if EXCLUDE_STRINGS:
+            logger.info(f"チェック対象から除外する文字列: {EXCLUDE_STRINGS}")
 
         if 'Records' not in event or not event['Records']:
             return {'statusCode': 400, 'body': json.dumps({'message': 'S3レコードがイベントに見つかりません。'}, ensure_ascii=False)}
@@ -173,17 +528,26 @@ def lambda_handler(event, context):
         input_bucket_name = s3_record['bucket']['name']
         input_object_key = urllib.parse.unquote_plus(s3_record['object']['key'], encoding='utf-8')
         response = s3_client.get_object(Bucket=input_bucket_name, Key=input_object_key)
-        input_data = json.loads(response['Body'].read().decode('utf-8'))
+        # json.loadsはバイト列を直接受け付けるため、文字列へデコードしたコピーを作らない
+        input_data = json.loads(response['Body'].read())
         
         auto_urls = input_data.get('auto_url_list', [])
         manual_urls = input_data.get('manual_url_list', [])
         all_results_for_csv = []
+        append_result = all_results_for_csv.append
+        # タイムスタンプは行ごとに生成せず、実行単位で1度だけ求めて全行で共有する（GAS側の差分比較でも対象外の列）
+        run_timestamp = datetime.now(JST).isoformat()
+        reset_retry_budget()
+        previous_pages, previous_links = load_page_cache()
+        current_pages = {}
+
+        # ブログページとリンクチェックはコネクションプールが別のため、それぞれのセッションで接続しておく
+        warm_up_connections([item.get('url') or '' for item in auto_urls], PAGE_SESSION)
+        warm_up_connections([item.get('affiliate_link') or '' for item in manual_urls], HTTP_SESSION)
 
         # ★★★【変更】結果を判定し、新しいCSV形式の辞書を返す共通関数 ★★★
-        def process_check_result(check_result, original_item):
-            status_code = check_result.get("status_code")
-            final_url = check_result.get("final_url")
-            error_message = check_result.get("error_message")
+        def process_check_result(check_result, original_item, blog_netloc=None):
+            status_code, final_url, error_message = check_result.status_code, check_result.final_url, check_result.error_message
             confirmation_result = "OK"  # デフォルトをOKとする
             
             is_successful_status = status_code and SUCCESS_STATUS_LOWER_BOUND <= status_code < SUCCESS_STATUS_UPPER_BOUND
@@ -194,119 +558,150 @@ def lambda_handler(event, context):
                 if not error_message:
                     error_message = f"ステータスコード異常: {status_code}"
             else: # ステータスが正常な場合でも追加のドメインチェック
-                parsed_final_url = urllib.parse.urlparse(final_url)
-                blog_url_str = original_item.get('spreadsheet_link') or original_item.get('url') or ''
-                parsed_blog_url = urllib.parse.urlparse(blog_url_str)
-                if parsed_final_url.netloc == "jass-net.com":
-                    confirmation_result, error_message = "NG", "リンク先のドメインが 'jass-net.com' です"
-                elif "hatena" in final_url and parsed_blog_url and parsed_final_url.netloc != parsed_blog_url.netloc:
-                    confirmation_result, error_message = "NG", "リンク先のURLに 'hatena' が含まれています"
-
-            return {
-                "スプレッドシート記載のリンク": original_item.get("spreadsheet_link") or original_item.get("url"),
-                "ブログ記事URL": original_item.get("blog_article_url"),
-                "アフィリエイト広告リンク": original_item.get("affiliate_link"),
-                "確認結果": confirmation_result,
-                "ステータスコード": status_code,
-                "アフィリエイト広告リンク先URL": final_url,
-                "エラーメッセージ": error_message,
-                "タイムスタンプ": datetime.now(JST).isoformat()
-            }
+                final_netloc = cached_urlparse(final_url).netloc
+                if final_netloc in NG_DESTINATION_NETLOCS:
+                    confirmation_result, error_message = "NG", f"リンク先のドメインが '{final_netloc}' です"
+                elif "hatena" in final_url:
+                    # ブログ側のnetlocは呼び出し元で算出済みのものを優先し、無い場合のみここで解析する
+                    if blog_netloc is None:
+                        blog_url_str = original_item.get('spreadsheet_link') or original_item.get('url') or ''
+                        blog_netloc = cached_urlparse(blog_url_str).netloc
+                    if final_netloc != blog_netloc:
+                        confirmation_result, error_message = "NG", "リンク先のURLに 'hatena' が含まれています"
+
+            return ResultRow(
+                spreadsheet_link=original_item.get("spreadsheet_link") or original_item.get("url"),
+                blog_article_url=original_item.get("blog_article_url"),
+                affiliate_link=original_item.get("affiliate_link"),
+                check_result=confirmation_result,
+                status_code=status_code,
+                final_url=final_url,
+                error_message=error_message,
+                timestamp=run_timestamp
+            )
+
+        # 手動URLリストのチェックはクロール結果に依存しないため先に投入し、ブログのクロール中もバックグラウンドで進める。
+        # 各ページの広告リンクも投入だけ行って次のページの取得へ進み、結果はクロール完了後にまとめて回収する
+        # （ページNのリンクチェックとページN+1の取得・解析を重ねて実行できる）。
+        # 同じ広告リンクは複数の記事・ページに現れるため、1回の実行内ではURLごとに1度だけチェックして結果を共有する
+        pending_link_checks = []
+        append_pending_link_check = pending_link_checks.append
+
+        # 複数ブログのクロールスレッドから呼ばれるため、同じURLを二重に投入しないようロックで保護する
+        link_check_futures_lock = threading.Lock()
+
+        def submit_link_check(link):
+            cache_key = link_check_key(link)
+            with link_check_futures_lock:
+                future = link_check_futures.get(cache_key)
+                if future is None:
+                    cached_link = previous_links.get(cache_key)
+                    future = LINK_CHECK_EXECUTOR.submit(check_link_status, link, NG_WORDS_PATTERN, CheckResult(*cached_link) if cached_link else None)
+                    link_check_futures[cache_key] = future
+            return future
+
+        # はてな・livedoorで共通の、1ページ分の広告リンクをチェック待ちに積む処理
+        def record_page_ad_links(extracted_links, blog_url, page_url, blog_netloc):
+            if extracted_links is None: return
+            filtered_links = [link for link in extracted_links if not any(ex_str in link for ex_str in EXCLUDE_STRINGS)]
+            if not filtered_links:
+                append_result(ResultRow(blog_url, page_url, page_url, "NG", None, page_url, "対象の広告リンクが見つかりませんでした", run_timestamp))
+            for link in filtered_links:
+                append_pending_link_check((submit_link_check(link), {"url": blog_url, "blog_article_url": page_url, "affiliate_link": link}, blog_netloc))
+
+        logger.info(f"手動URLリストのチェックを投入します。件数: {len(manual_urls)}")
+        filtered_manual_urls = [item for item in manual_urls if item.get('affiliate_link') and not any(ex_str in item.get('affiliate_link') for ex_str in EXCLUDE_STRINGS)]
+        for manual_item in filtered_manual_urls:
+            append_pending_link_check((submit_link_check(manual_item.get('affiliate_link')), manual_item, None))
+
+        # クロール間隔は一律のsleepではなくホストごとの前回リクエスト時刻から求め、解析などに要した時間は待ち時間から差し引く
+        # （別ホストのブログへ移る際は待たない）
+        # 同じホストのブログが複数ある場合も間隔を守れるよう、送信予定時刻をロック内で確保してからロック外で待つ
+        last_page_request_times = {}
+        last_page_request_times_lock = threading.Lock()
+
+        def wait_for_host_interval(url, interval):
+            netloc = cached_urlparse(url).netloc
+            with last_page_request_times_lock:
+                now = time.monotonic()
+                last_request_time = last_page_request_times.get(netloc)
+                request_time = now if last_request_time is None else max(now, last_request_time + interval)
+                last_page_request_times[netloc] = request_time
+            if request_time > now: time.sleep(request_time - now)
 
         # --- 自動URLリストの処理 ---
         logger.info(f"自動URLリストの処理を開始します。件数: {len(auto_urls)}")
-        for target_item in auto_urls:
+        # ブログ同士は独立しているため、ブログ単位のクロールを並行して実行する（各ブログ内のページ取得は順番どおり）
+        def crawl_blog(target_item):
             blog_url = target_item.get('url')
-            if not blog_url: continue
+            if not blog_url: return
             
+            blog_netloc = cached_urlparse(blog_url).netloc
             is_hatena = "hatenablog.com" in blog_url or "hatenablog.jp" in blog_url
             is_livedoor = "livedoor.blog" in blog_url or "blog.jp" in blog_url
             
             if is_hatena:
                 current_page_url = blog_url
-                while current_page_url:
-                    html_content = get_html_content(current_page_url)
-                    if not html_content: break
-                    extracted_links = extract_ad_links(html_content, current_page_url)
-                    if extracted_links is not None:
-                        filtered_links = [link for link in extracted_links if not any(ex_str in link for ex_str in exclude_strings)]
-                        if not filtered_links:
-                            all_results_for_csv.append({"スプレッドシート記載のリンク": blog_url, "ブログ記事URL": current_page_url, "アフィリエイト広告リンク": current_page_url, "確認結果": "NG", "ステータスコード": None, "アフィリエイト広告リンク先URL": current_page_url, "エラーメッセージ": "対象の広告リンクが見つかりませんでした", "タイムスタンプ": datetime.now(JST).isoformat()})
-                        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                            future_to_link = {executor.submit(check_link_status, link, ng_words): link for link in filtered_links}
-                            for future in as_completed(future_to_link):
-                                link = future_to_link[future]
-                                try:
-                                    check_result = future.result()
-                                    original_item_data = {"url": blog_url, "blog_article_url": current_page_url, "affiliate_link": link}
-                                    processed_result = process_check_result(check_result, original_item_data)
-                                    all_results_for_csv.append(processed_result)
-                                except Exception as exc:
-                                    logger.error(f"リンクチェック中に例外が発生しました {link}: {exc}")
-                                    all_results_for_csv.append({"スプレッドシート記載のリンク": blog_url, "ブログ記事URL": current_page_url, "アフィリエイト広告リンク": link, "確認結果": "NG", "ステータスコード": None, "アフィリエイト広告リンク先URL": link, "エラーメッセージ": str(exc), "タイムスタンプ": datetime.now(JST).isoformat()})
-                    current_page_url = find_hatena_next_page_link(html_content, current_page_url)
-                    if current_page_url: time.sleep(CRAWL_WAIT_SECONDS)
+                while current_page_url and not crawl_stopped.is_set():
+                    wait_for_host_interval(current_page_url, CRAWL_WAIT_SECONDS)
+                    page_result = get_page_result(current_page_url, analyze_hatena_page, previous_pages, current_pages)
+                    if not page_result: break
+                    record_page_ad_links(page_result['ad_links'], blog_url, current_page_url, blog_netloc)
+                    current_page_url = page_result['next_page']
             elif is_livedoor:
                 all_article_urls = set()
                 current_list_page_url = blog_url
-                while current_list_page_url:
-                    list_page_html = get_html_content(current_list_page_url)
-                    if not list_page_html: break
-                    all_article_urls.update(extract_livedoor_article_links(list_page_html, current_list_page_url))
-                    current_list_page_url = find_livedoor_next_page_link(list_page_html, current_list_page_url)
-                    if current_list_page_url: time.sleep(CRAWL_WAIT_SECONDS)
+                while current_list_page_url and not crawl_stopped.is_set():
+                    wait_for_host_interval(current_list_page_url, CRAWL_WAIT_SECONDS)
+                    page_result = get_page_result(current_list_page_url, analyze_livedoor_list_page, previous_pages, current_pages)
+                    if not page_result: break
+                    all_article_urls.update(page_result['article_urls'])
+                    current_list_page_url = page_result['next_page']
                 for article_url in all_article_urls:
-                    time.sleep(PER_ARTICLE_WAIT_SECONDS)
-                    article_html = get_html_content(article_url)
-                    if not article_html: continue
-                    extracted_links = extract_ad_links(article_html, article_url)
-                    if extracted_links is not None:
-                        filtered_links = [link for link in extracted_links if not any(ex_str in link for ex_str in exclude_strings)]
-                        if not filtered_links:
-                            all_results_for_csv.append({"スプレッドシート記載のリンク": blog_url, "ブログ記事URL": article_url, "アフィリエイト広告リンク": article_url, "確認結果": "NG", "ステータスコード": None, "アフィリエイト広告リンク先URL": article_url, "エラーメッセージ": "対象の広告リンクが見つかりませんでした", "タイムスタンプ": datetime.now(JST).isoformat()})
-                        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                            future_to_link = {executor.submit(check_link_status, link, ng_words): link for link in filtered_links}
-                            for future in as_completed(future_to_link):
-                                link = future_to_link[future]
-                                try:
-                                    check_result = future.result()
-                                    original_item_data = {"url": blog_url, "blog_article_url": article_url, "affiliate_link": link}
-                                    processed_result = process_check_result(check_result, original_item_data)
-                                    all_results_for_csv.append(processed_result)
-                                except Exception as exc:
-                                    logger.error(f"リンクチェック中に例外が発生しました {link}: {exc}")
-                                    all_results_for_csv.append({"スプレッドシート記載のリンク": blog_url, "ブログ記事URL": article_url, "アフィリエイト広告リンク": link, "確認結果": "NG", "ステータスコード": None, "アフィリエイト広告リンク先URL": link, "エラーメッセージ": str(exc), "タイムスタンプ": datetime.now(JST).isoformat()})
+                    if crawl_stopped.is_set(): break
+                    wait_for_host_interval(article_url, PER_ARTICLE_WAIT_SECONDS)
+                    page_result = get_page_result(article_url, analyze_livedoor_article, previous_pages, current_pages)
+                    if not page_result: continue
+                    record_page_ad_links(page_result['ad_links'], blog_url, article_url, blog_netloc)
             else:
                 logger.warning(f"サポート外のブログタイプです: {blog_url}")
 
-        # --- 手動URLリストの処理 ---
-        logger.info(f"手動URLリストの処理を開始します。件数: {len(manual_urls)}")
-        filtered_manual_urls = [item for item in manual_urls if item.get('affiliate_link') and not any(ex_str in item.get('affiliate_link') for ex_str in exclude_strings)]
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_manual_item = {executor.submit(check_link_status, item.get('affiliate_link'), ng_words): item for item in filtered_manual_urls}
-            for future in as_completed(future_to_manual_item):
-                manual_item = future_to_manual_item[future]
-                try:
-                    check_result = future.result()
-                    processed_result = process_check_result(check_result, manual_item)
-                    all_results_for_csv.append(processed_result)
-                except Exception as exc:
-                    logger.error(f"手動リンクチェック中に例外が発生しました {manual_item.get('affiliate_link')}: {exc}")
-                    all_results_for_csv.append({"スプレッドシート記載のリンク": manual_item.get('spreadsheet_link'), "ブログ記事URL": manual_item.get('blog_article_url'), "アフィリエイト広告リンク": manual_item.get('affiliate_link'), "確認結果": "NG", "ステータスコード": None, "アフィリエイト広告リンク先URL": manual_item.get('affiliate_link'), "エラーメッセージ": str(exc), "タイムスタンプ": datetime.now(JST).isoformat()})
+        blog_crawl_futures.extend(BLOG_CRAWL_EXECUTOR.submit(crawl_blog, target_item) for target_item in auto_urls)
+        for blog_crawl_future in blog_crawl_futures:
+            blog_crawl_future.result()
+
+        # --- リンクチェック結果の回収 ---
+        logger.info(f"リンクチェック結果を回収します。件数: {len(pending_link_checks)}（ユニークURL数: {len(link_check_futures)}）")
+        for future, original_item, blog_netloc in pending_link_checks:
+            try:
+                processed_result = process_check_result(future.result(), original_item, blog_netloc)
+                append_result(processed_result)
+            except Exception as exc:
+                logger.error(f"リンクチェック中に例外が発生しました {original_item.get('affiliate_link')}: {exc}")
+                append_result(ResultRow(original_item.get('spreadsheet_link') or original_item.get('url'), original_item.get('blog_article_url'), original_item.get('affiliate_link'), "NG", None, original_item.get('affiliate_link'), str(exc), run_timestamp))
         
         # --- 結果の出力 ---
         logger.info(f"CSV出力対象の結果件数: {len(all_results_for_csv)}")
         if S3_OUTPUT_BUCKET:
             csv_output_key = "linkcheck_result.csv"
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=CSV_HEADERS)
-            writer.writeheader()
+            # 文字列全体を組み立ててから再エンコードせず、UTF-8(BOM付き)のバイト列へ直接書き出す
+            csv_buffer = io.BytesIO()
+            text_stream = io.TextIOWrapper(csv_buffer, encoding='utf-8-sig', newline='')
+            writer = csv.writer(text_stream)
+            writer.writerow(CSV_HEADERS)
             if all_results_for_csv:
-                all_results_for_csv.sort(key=lambda x: (str(x.get('スプレッドシート記載のリンク', '')), str(x.get('ブログ記事URL', '')), str(x.get('アフィリエイト広告リンク', ''))))
+                all_results_for_csv.sort(key=lambda x: (str(x.spreadsheet_link), str(x.blog_article_url), str(x.affiliate_link)))
                 writer.writerows(all_results_for_csv)
-            csv_body = output.getvalue()
-            s3_client.put_object(Bucket=S3_OUTPUT_BUCKET, Key=csv_output_key, Body=csv_body.encode('utf-8-sig'), ContentType='text/csv')
+            text_stream.flush()
+            text_stream.detach()
+            csv_buffer.seek(0)
+            # 今回取得したページだけを保存し、削除された記事などのエントリは引き継がない
+            # （CSVのアップロードとは独立しているため、手の空いたワーカーで並行して送信する）
+            page_cache_future = LINK_CHECK_EXECUTOR.submit(save_page_cache, current_pages, collect_link_cache(link_check_futures))
+            # upload_fileobjはサイズが大きい場合に自動でマルチパートアップロードへ切り替わる
+            s3_client.upload_fileobj(csv_buffer, S3_OUTPUT_BUCKET, csv_output_key, ExtraArgs={'ContentType': 'text/csv'})
             logger.info(f"結果CSVを s3://{S3_OUTPUT_BUCKET}/{csv_output_key} にアップロードしました")
+            page_cache_future.result()
         else:
             logger.error("S3_OUTPUT_BUCKET 環境変数が設定されていません。結果をアップロードできません。")
         
@@ -314,4 +709,11 @@ def lambda_handler(event, context):
 
     except Exception as e:
         logger.error(f"リンクチェック処理中に予期せぬエラーが発生しました: {e}", exc_info=True)
+        # プールは次回の実行（ウォームスタート）でも使われるため、残った処理がワーカー・ホストごとの同時接続枠・リトライ予算を
+        # 消費し続けないよう、クロールを止めてから未実行のリンクチェックを取り消し、実行中のものの終了を待つ
+        crawl_stopped.set()
+        for blog_crawl_future in blog_crawl_futures: blog_crawl_future.cancel()
+        wait(blog_crawl_futures)
+        for link_check_future in link_check_futures.values(): link_check_future.cancel()
+        wait(link_check_futures.values())
         return {'statusCode': 500, 'body': json.dumps({'message': f'リンクチェック処理中にエラーが発生しました: {str(e)}'}, ensure_ascii=False)}
\ No newline at end of file
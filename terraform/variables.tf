@@ -58,6 +58,17 @@ variable "lambda_max_workers" {
   type        = number
 }
 
+variable "lambda_max_connections_per_host" {
+  description = "リンクチェックで同一ホストへ同時に送るリクエスト数の上限"
+  type        = number
+  default     = 4
+
+  validation {
+    condition     = var.lambda_max_connections_per_host >= 1
+    error_message = "lambda_max_connections_per_host には1以上の値を指定してください。"
+  }
+}
+
 variable "lambda_crawl_wait_seconds" {
   description = "クロール待機時間（秒）"
   type        = number